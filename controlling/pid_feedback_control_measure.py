@@ -5,7 +5,6 @@ Created on Jan 23, 2023
 """
 import time
 
-import numpy
 import pyqtgraph as pg
 from qtpy import QtWidgets
 
@@ -65,7 +64,10 @@ class PIDFeedbackControl(Measurement):
             description=f"condition for {self.name} to end.",
         )
         s.New("save_h5", bool, initial=False)
-        self.data = mk_data_dict(600, 1.0)
+        s.New("sensor_value", float, initial=0, ro=True)
+        s.get_lq("sensor_value").enable_history(600)
+        s.get_lq("setpoint").enable_history(600)
+        self.t0 = time.time()
 
     def setup_figure(self):
         s = self.settings
@@ -87,9 +89,8 @@ class PIDFeedbackControl(Measurement):
 
         graph_widget = pg.GraphicsLayoutWidget(border=(0, 0, 0))
         axes = graph_widget.addPlot(title=self.name)
-        t = self.data["lab_times"]
-        self.sensor_values_plotline = axes.plot(t, self.data["sensor_values"], pen="w")
-        self.setpoints_plotline = axes.plot(t, self.data["setpoints"], pen="y")
+        self.sensor_values_plotline = axes.plot(pen="w")
+        self.setpoints_plotline = axes.plot(pen="y")
 
         self.ui = QtWidgets.QWidget()
         self.layout = QtWidgets.QVBoxLayout(self.ui)
@@ -106,10 +107,9 @@ class PIDFeedbackControl(Measurement):
 
         pid = PID(s["Kp"], s["Ki"], s["Kd"], setpoint=s["setpoint"])
 
-        ii = 0
-        wrap_around = 600
-        self.data = mk_data_dict(wrap_around, s["setpoint"])
-        t0 = time.time()
+        s.get_lq("sensor_value").history_buffer.clear()
+        s.get_lq("setpoint").history_buffer.clear()
+        t0 = self.t0 = time.time()
         lab_time = 0
 
         while not self.interrupt_measurement_called:
@@ -120,14 +120,13 @@ class PIDFeedbackControl(Measurement):
             s["error"] = 100.0 * (1 - sensor_value / s["setpoint"])
             lab_time = time.time() - t0
 
-            self.data["setpoints"][ii] = s["setpoint"]
-            self.data["sensor_values"][ii] = sensor_value
-            self.data["lab_times"][ii] = lab_time
+            # sample both into their history buffers
+            s["sensor_value"] = sensor_value
+            s["setpoint"] = s["setpoint"]
 
             if self.should_terminate(lab_time):
                 break
 
-            ii = (ii + 1) % wrap_around
             time.sleep(0.01)
 
         if s["save_h5"]:
@@ -148,9 +147,11 @@ class PIDFeedbackControl(Measurement):
             return lab_time >= s["timeout"] or abs(s["error"]) <= s["error_tol"]
 
     def update_display(self):
-        t = self.data["lab_times"]
-        self.sensor_values_plotline.setData(t, self.data["sensor_values"])
-        self.setpoints_plotline.setData(t, self.data["setpoints"])
+        s = self.settings
+        t, sensor_values = s.get_lq("sensor_value").history()
+        self.sensor_values_plotline.setData(t - self.t0, sensor_values)
+        t, setpoints = s.get_lq("setpoint").history()
+        self.setpoints_plotline.setData(t - self.t0, setpoints)
 
     def update_choices(self):
         s = self.settings
@@ -191,14 +192,10 @@ class PIDFeedbackControl(Measurement):
     def save_h5(self):
         h5_file = h5_io.h5_base_file(app=self.app, measurement=self)
         group = h5_io.h5_create_measurement_group(self, h5_file)
-        for k, v in self.data.items():
-            group[k] = v
+        t, sensor_values = self.settings.get_lq("sensor_value").history()
+        group["sensor_values"] = sensor_values
+        group["lab_times"] = t - self.t0
+        t, setpoints = self.settings.get_lq("setpoint").history()
+        group["setpoints"] = setpoints
+        group["setpoint_lab_times"] = t - self.t0
         h5_file.close()
-
-
-def mk_data_dict(N, setpoint):
-    return {
-        "setpoints": numpy.ones(N) * setpoint,
-        "sensor_values": numpy.zeros(N),
-        "lab_times": numpy.arange(N),
-    }
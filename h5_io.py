@@ -3,8 +3,11 @@ import functools
 import time
 from datetime import datetime
 import os
+import queue
+import threading
 
 import h5py
+import numpy as np
 
 from .cb32_uuid import cb32_uuid
 
@@ -326,3 +329,224 @@ def _settings_visitfunc(name, node, settings):
     for key, val in node.attrs.items():
         lq_path = f"{name.replace('settings', key)}"
         settings[lq_path] = val
+
+
+class H5AsyncWriter(object):
+    """
+    Writes to HDF5 datasets from a dedicated thread, so that disk latency
+    does not stall an acquisition loop.
+    
+    The acquisition thread calls :meth:`write` which only copies the data
+    into a bounded queue. The writer thread merges writes to adjacent
+    regions of a dataset (e.g. consecutive pixels of a scan line) into one
+    hyperslab write and flushes the file every *flush_period* seconds or 
+    *flush_bytes* bytes. :meth:`close` drains the queue, call it before
+    closing the file (also on interrupt).
+    
+    ==============  ==========================================================
+    **Arguments:**  **Description:**
+    h5_file         open h5py.File
+    max_queue       maximum number of pending writes, :meth:`write` blocks 
+                    when the queue is full (backpressure)
+    flush_period    maximum time (s) between h5_file.flush() calls
+    flush_bytes     flush after this many bytes have been written
+    ==============  ==========================================================
+    
+    Example::
+    
+        writer = H5AsyncWriter(h5_file)
+        for (jj, ii) in pixels:
+            writer.write(counts_h5, (jj, ii), counts)
+        writer.close()
+        h5_file.close()
+    """
+    
+    _FLUSH = object() # queue item that requests a flush
+    _STOP = object()
+    
+    def __init__(self, h5_file, max_queue=10000, flush_period=1.0, flush_bytes=64*1024**2):
+        self.h5_file = h5_file
+        self.flush_period = flush_period
+        self.flush_bytes = flush_bytes
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.error = None
+        
+        self.n_writes = 0 # calls to write()
+        self.n_hyperslab_writes = 0 # actual writes to h5 datasets
+        self.n_flushes = 0
+        self.bytes_written = 0
+        self.write_time = 0.0 # time spent in h5 writes and flushes
+        self.blocked_time = 0.0 # time write() waited on a full queue
+        self.max_queue_depth = 0
+        
+        self._t_last_flush = time.monotonic()
+        self._bytes_since_flush = 0
+        self._thread = threading.Thread(target=self._run, name='h5_async_writer', daemon=True)
+        self._thread.start()
+    
+    def write(self, dataset, index, data):
+        """queue dataset[index] = data, *index* is an int, slice or tuple of them"""
+        self._raise_error()
+        item = (dataset, index, np.array(data, dtype=dataset.dtype))
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            t0 = time.perf_counter()
+            self.queue.put(item)
+            self.blocked_time += time.perf_counter() - t0
+        self.n_writes += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def flush(self):
+        """request h5_file.flush() after the writes queued so far, does not block"""
+        self.queue.put(self._FLUSH)
+    
+    def drain(self):
+        """block until all queued writes are written and flushed"""
+        self.flush()
+        self.queue.join()
+        self._raise_error()
+    
+    def close(self):
+        """drain the queue and stop the writer thread"""
+        if self._thread is None:
+            return
+        self.queue.put(self._FLUSH)
+        self.queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+        self._raise_error()
+
+    @property
+    def stats(self):
+        return dict(queue_depth=self.queue.qsize(),
+                    max_queue_depth=self.max_queue_depth,
+                    n_writes=self.n_writes,
+                    n_hyperslab_writes=self.n_hyperslab_writes,
+                    n_flushes=self.n_flushes,
+                    MB_written=self.bytes_written/1024**2,
+                    write_MBps=self.bytes_written/1024**2/self.write_time if self.write_time else 0.0,
+                    blocked_time=self.blocked_time)
+
+    def _raise_error(self):
+        if self.error is not None:
+            err, self.error = self.error, None
+            raise err
+    
+    def _run(self):
+        stop = False
+        while not stop:
+            try:
+                items = [self.queue.get(timeout=self.flush_period)]
+            except queue.Empty:
+                items = []
+            # take what else is waiting, so that adjacent writes can be merged
+            while len(items) < 4096:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            flush = False
+            block = None
+            try:
+                for item in items:
+                    if item is self._STOP:
+                        stop = True
+                    elif item is self._FLUSH:
+                        flush = True
+                    elif self.error is None:
+                        block = self._merge_or_write(block, *item)
+                if block is not None:
+                    self._write_block(block)
+                if (flush or self._bytes_since_flush >= self.flush_bytes
+                        or time.monotonic() - self._t_last_flush > self.flush_period):
+                    self._flush()
+            except Exception as err:
+                self.error = err
+            finally:
+                for item in items:
+                    self.queue.task_done()
+
+    def _merge_or_write(self, block, dataset, index, data):
+        """
+        *block* is a pending hyperslab write [dataset, start, count, axis, pieces].
+        Extends it with this write if adjacent along one axis, otherwise
+        writes it and returns a new block (or writes fancy indexed data directly).
+        """
+        start_count = _index_to_hyperslab(index, dataset.shape)
+        if start_count is None or data.size != np.prod(start_count[1]):
+            # fancy indexing or broadcasting, not merged
+            if block is not None:
+                self._write_block(block)
+            self._write(dataset, index, data)
+            return None
+        start, count = start_count
+        data = data.reshape(count)
+        if block is not None and block[0] == dataset:
+            b_start, b_count = block[1], block[2]
+            diff = [d for d in range(len(start)) if start[d] != b_start[d] or count[d] != b_count[d]]
+            if len(diff) == 1 and block[3] in (None, diff[0]):
+                d = diff[0]
+                if b_start[d] + b_count[d] == start[d]:
+                    block[4].append(data)
+                elif start[d] + count[d] == b_start[d]:
+                    block[4].insert(0, data)
+                    b_start[d] = start[d]
+                else:
+                    d = None
+                if d is not None:
+                    b_count[d] += count[d]
+                    block[3] = d
+                    return block
+        if block is not None:
+            self._write_block(block)
+        return [dataset, list(start), list(count), None, [data]]
+    
+    def _write_block(self, block):
+        dataset, start, count, axis, pieces = block
+        data = pieces[0] if len(pieces) == 1 else np.concatenate(pieces, axis=axis)
+        self._write(dataset, tuple(slice(a, a + n) for a, n in zip(start, count)), data)
+    
+    def _write(self, dataset, index, data):
+        t0 = time.perf_counter()
+        dataset[index] = data
+        self.write_time += time.perf_counter() - t0
+        self.n_hyperslab_writes += 1
+        self.bytes_written += data.nbytes
+        self._bytes_since_flush += data.nbytes
+
+    def _flush(self):
+        t0 = time.perf_counter()
+        self.h5_file.flush()
+        self.write_time += time.perf_counter() - t0
+        self.n_flushes += 1
+        self._t_last_flush = time.monotonic()
+        self._bytes_since_flush = 0
+
+
+def _index_to_hyperslab(index, shape):
+    """
+    converts a basic numpy index to (start, count) lists covering all axes,
+    returns None for indexes that are not a contiguous block
+    """
+    if not isinstance(index, tuple):
+        index = (index,)
+    if len(index) > len(shape):
+        return None
+    start, count = [], []
+    for i, n in zip(index, shape):
+        if isinstance(i, slice):
+            a, b, step = i.indices(n)
+            if step != 1 or b <= a:
+                return None
+            start.append(a)
+            count.append(b - a)
+        elif isinstance(i, (int, np.integer)):
+            start.append(int(i) % n)
+            count.append(1)
+        else:
+            return None
+    for n in shape[len(index):]:
+        start.append(0)
+        count.append(n)
+    return start, count
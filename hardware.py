@@ -17,10 +17,17 @@ class HardwareComponent(QtCore.QObject):
     
     to subclass, implement :meth:`setup`, :meth:`connect` and :meth:`disconnect`
     
+    settings created with a *poll_period* are periodically read from hardware
+    by the app's :attr:`hardware_poller` while connected, which is preferred
+    over implementing a custom :meth:`threaded_update` loop.
+    
     """
     connection_succeeded = QtCore.Signal()
     connection_failed = QtCore.Signal()
     
+    depends_on = ()
+    """names of hardware components that have to be connected before this one,
+    used by BaseMicroscopeApp.connect_all and disconnect_all"""
     
 
     def add_logged_quantity(self, name, **kwargs):
@@ -82,6 +89,8 @@ class HardwareComponent(QtCore.QObject):
         
         self.auto_thread_lock = True
         
+        self.depends_on = list(self.depends_on)
+        
         self.setup()
 
         if self.auto_thread_lock:        
@@ -208,13 +217,7 @@ class HardwareComponent(QtCore.QObject):
     def enable_connection(self, enable=True):
         if enable:
             try:
-                self.connect()
-                # start thread if needed
-                if hasattr(self, 'run'):
-                    self.update_thread_interrupted = False
-                    self._update_thread = threading.Thread(target=self.run)
-                    self._update_thread.start()
-
+                self.connect_and_start_thread()
                 self.connection_succeeded.emit()
             except Exception as err:
                 self.connection_failed.emit()
@@ -222,21 +225,59 @@ class HardwareComponent(QtCore.QObject):
         else:
             print("disabling connection")
             try:
-                try:
-                    if hasattr(self, 'run') and hasattr(self, '_update_thread'):
-                        self.update_thread_interrupted = True
-                        self._update_thread.join(timeout=5.0)
-                        del self._update_thread
-                finally:
-                    self.disconnect()
-                    self.tree_item.setText(1,'X')
-                    self.tree_item.setForeground(1, QtGui.QColor('red'))          
+                self.stop_thread_and_disconnect()
             except Exception as err:
                 # disconnect failed
-                self.tree_item.setText(1,'?')
-                self.tree_item.setForeground(1, QtGui.QColor('red'))        
+                self.set_tree_status('?')
                 raise err
-            
+
+    def connect_and_start_thread(self):
+        """
+        :meth:`connect` and start the :meth:`threaded_update` thread if needed.
+        Does not touch the gui or the *connected* setting, so may be called
+        from a worker thread (see BaseMicroscopeApp.connect_all)
+        """
+        self.connect()
+        # start thread if needed
+        if hasattr(self, 'run'):
+            self.update_thread_interrupted = False
+            self._update_thread = threading.Thread(target=self.run)
+            self._update_thread.start()
+
+    def stop_thread_and_disconnect(self):
+        """
+        stop the :meth:`threaded_update` thread and :meth:`disconnect`.
+        Does not touch the *connected* setting. The tree status is only 
+        updated when called from the gui thread.
+        """
+        try:
+            if hasattr(self, 'run') and hasattr(self, '_update_thread'):
+                self.update_thread_interrupted = True
+                self._update_thread.join(timeout=5.0)
+                del self._update_thread
+        finally:
+            self.disconnect()
+            if QtCore.QThread.currentThread() == self.thread():
+                self.set_tree_status('X')
+
+    def set_connected_silently(self, connected):
+        """
+        update the *connected* setting (and its widgets) without
+        calling :meth:`enable_connection`
+        """
+        lq = self.settings.connected
+        lq.updated_value[bool].disconnect(self.enable_connection)
+        try:
+            lq.update_value(connected)
+        finally:
+            lq.updated_value[bool].connect(self.enable_connection)
+
+    def set_tree_status(self, symbol, color='red'):
+        if hasattr(self, 'tree_item'):
+            self.tree_item.setText(1, symbol)
+            self.tree_item.setForeground(1, QtGui.QColor(color))
+
+
     def run(self):
         if hasattr(self, 'threaded_update'):
             while not self.update_thread_interrupted:
@@ -248,15 +289,13 @@ class HardwareComponent(QtCore.QObject):
             
     def on_connection_succeeded(self):
         print(self.name, "connection succeeded!")
-        self.tree_item.setText(1,'O')
-        self.tree_item.setForeground(1, QtGui.QColor('green'))
+        self.set_tree_status('O', 'green')
 
             
     def on_connection_failed(self):
         print(self.name, "connection failed!")        
         self.settings.connected.update_value(False)
-        self.tree_item.setText(1,'!')
-        self.tree_item.setForeground(1, QtGui.QColor('red'))   
+        self.set_tree_status('!')
           
 
     @property
@@ -0,0 +1,176 @@
+"""
+App-level scheduler that periodically calls read_from_hardware on
+LoggedQuantities that declare a poll period::
+
+    self.settings.New('temperature', float, ro=True, poll_period=0.5)
+
+All connected hardware components of a BaseMicroscopeApp are serviced
+by one scheduler thread and a small, bounded thread pool. Due reads of one
+component are batched into one job that runs under the component's lock.
+Each component has at most one job in flight, so a slow device occupies
+at most one worker and can not starve fast ones.
+"""
+from __future__ import absolute_import, print_function
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class PollStats(object):
+    """Read statistics of a single polled LoggedQuantity"""
+
+    def __init__(self):
+        self.n_reads = 0
+        self.n_errors = 0
+        self.missed_deadlines = 0 # number of poll periods skipped
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def mean_latency(self):
+        if self.n_reads == 0:
+            return 0.0
+        return self.total_latency / self.n_reads
+
+    def as_dict(self):
+        return dict(n_reads=self.n_reads,
+                    n_errors=self.n_errors,
+                    missed_deadlines=self.missed_deadlines,
+                    last_latency=self.last_latency,
+                    mean_latency=self.mean_latency,
+                    max_latency=self.max_latency)
+
+
+class HardwarePollingScheduler(object):
+    """
+    Polls hardware-connected LoggedQuantities with a *poll_period* set.
+
+    ==============  ==========================================================
+    **Arguments:**  **Description:**
+    hardware        dict-like of HardwareComponents (e.g. app.hardware)
+    max_workers     maximum number of concurrent hardware reads
+    idle_period     maximum time (s) the scheduler sleeps between checks
+                    for new polled settings or connected components
+    ==============  ==========================================================
+    """
+
+    def __init__(self, hardware, max_workers=4, idle_period=0.1):
+        self.hardware = hardware
+        self.max_workers = max_workers
+        self.idle_period = idle_period
+
+        self.stats = dict() # path --> PollStats
+        self._next_due = dict() # lq --> time.monotonic() of next read
+        self._busy = set() # names of components with a job in flight
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._interrupted = True
+        self._thread = None
+        self._executor = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self.is_running:
+            return
+        self._interrupted = False
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='hw_poll')
+        self._thread = threading.Thread(target=self._run, name='hw_poll_scheduler',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop scheduling and wait for reads in progress to finish"""
+        if not self.is_running:
+            return
+        self._interrupted = True
+        self._wake.set()
+        self._thread.join(timeout=timeout)
+        self._executor.shutdown(wait=True)
+        self._thread = None
+        self._executor = None
+
+    def polled_lqs(self, hw):
+        return [lq for lq in hw.settings.as_list()
+                if lq.poll_period and lq.has_hardware_read()]
+
+    def get_stats(self):
+        """returns dict of path --> dict of read statistics"""
+        with self._lock:
+            return {path: st.as_dict() for path, st in self.stats.items()}
+
+    def report(self):
+        lines = ["{:40} {:>8} {:>6} {:>8} {:>10} {:>10}".format(
+                    "setting", "reads", "errors", "missed", "mean [ms]", "max [ms]")]
+        for path, st in self.get_stats().items():
+            lines.append("{:40} {:>8} {:>6} {:>8} {:>10.2f} {:>10.2f}".format(
+                path, st['n_reads'], st['n_errors'], st['missed_deadlines'],
+                1e3*st['mean_latency'], 1e3*st['max_latency']))
+        return "\n".join(lines)
+
+    def _run(self):
+        while not self._interrupted:
+            self._wake.clear()
+            now = time.monotonic()
+            next_wake = now + self.idle_period
+            for hw in list(self.hardware.values()):
+                if not hw.settings['connected']:
+                    continue
+                due = []
+                for lq in self.polled_lqs(hw):
+                    t_due = self._next_due.setdefault(lq, now)
+                    if t_due <= now:
+                        due.append(lq)
+                    else:
+                        next_wake = min(next_wake, t_due)
+                with self._lock:
+                    if not due or hw.name in self._busy:
+                        continue
+                    self._busy.add(hw.name)
+                self._executor.submit(self._poll_hw, hw, due)
+            self._wake.wait(max(0.0, next_wake - time.monotonic()))
+
+    def _poll_hw(self, hw, lqs):
+        try:
+            with hw.lock:
+                for lq in lqs:
+                    self._poll_lq(hw, lq)
+        finally:
+            with self._lock:
+                self._busy.discard(hw.name)
+            self._wake.set()
+
+    def _poll_lq(self, hw, lq):
+        path = "hw/{}/{}".format(hw.name, lq.name)
+        period = lq.poll_period
+        t_due = self._next_due[lq]
+        t0 = time.monotonic()
+        error = False
+        try:
+            lq.read_from_hardware()
+        except Exception as err:
+            error = True
+            logger.error("polling {} failed: {}".format(path, err))
+        t1 = time.monotonic()
+
+        # poll periods that ended before this read was done are missed,
+        # skip them rather than bursting to catch up
+        missed = int((t1 - t_due) // period)
+        self._next_due[lq] = max(t_due + (missed + 1) * period, t1)
+
+        with self._lock:
+            st = self.stats.setdefault(path, PollStats())
+            st.n_reads += 1
+            st.n_errors += error
+            st.missed_deadlines += missed
+            st.last_latency = t1 - t0
+            st.max_latency = max(st.max_latency, t1 - t0)
+            st.total_latency += t1 - t0
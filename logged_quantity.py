@@ -2,9 +2,11 @@ from __future__ import absolute_import, print_function
 from qtpy import  QtCore, QtWidgets, QtGui
 import pyqtgraph
 import numpy as np
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
 import json
 import sys
+import weakref
 from ScopeFoundry.helper_funcs import get_logger_from_class, str2bool, QLock, \
     bool2str
 from ScopeFoundry.ndarray_interactive import ArrayLQ_QTableModel
@@ -12,6 +14,8 @@ import pyqtgraph as pg
 from inspect import signature
 from ScopeFoundry.widgets import MinMaxQSlider
 import os
+import time
+import logging
 
 #import threading
 
@@ -30,6 +34,85 @@ class DummyLock(object):
         pass
 
 
+class LQHistory(object):
+    """
+    Fixed size ring buffer of (timestamp, value) pairs, see
+    :meth:`LoggedQuantity.enable_history`
+    
+    Storage is preallocated, :meth:`append` does not allocate memory.
+    Timestamps are seconds since epoch (time.time()).
+    
+    ==============  ==========================================================
+    **Arguments:**  **Description:**
+    maxlen          number of samples kept, older samples are overwritten
+    dtype           numpy dtype of the values
+    shape           shape of a single value, () for scalars
+    ==============  ==========================================================
+    """
+
+    def __init__(self, maxlen, dtype=float, shape=()):
+        assert maxlen > 0
+        self.maxlen = int(maxlen)
+        self.times = np.zeros(self.maxlen, dtype=float)
+        self.values = np.zeros((self.maxlen,) + tuple(shape), dtype=dtype)
+        self.count = 0 # total number of samples ever appended
+        self.lock = QLock(mode=0)
+
+    def append(self, value, t=None):
+        if t is None:
+            t = time.time()
+        with self.lock:
+            i = self.count % self.maxlen
+            self.times[i] = t
+            self.values[i] = value
+            self.count += 1
+
+    def clear(self):
+        with self.lock:
+            self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.maxlen)
+
+    def get(self, since=None, max_points=None):
+        """
+        returns (times, values) arrays in chronological order
+        
+        ==============  ======================================================
+        **Arguments:**  **Description:**
+        since           only return samples with timestamp >= since
+        max_points      if given, return an evenly strided view with at most
+                        max_points samples (for plotting long histories)
+        ==============  ======================================================
+        """
+        with self.lock:
+            n = len(self)
+            start = self.count % self.maxlen if self.count > self.maxlen else 0
+            if start == 0:
+                times = self.times[:n].copy()
+                values = self.values[:n].copy()
+            else:
+                times = np.concatenate((self.times[start:], self.times[:start]))
+                values = np.concatenate((self.values[start:], self.values[:start]))
+        if since is not None:
+            i0 = np.searchsorted(times, since, side='left')
+            times = times[i0:]
+            values = values[i0:]
+        if max_points is not None and len(times) > max_points:
+            stride = int(np.ceil(len(times) / max_points))
+            times = times[::stride]
+            values = values[::stride]
+        return times, values
+
+
+# signatures of the value signals, used to track connected receivers
+_SIG_VALUE = b'updated_value()'
+_SIG_VALUE_STR = b'updated_value(QString)'
+_SIG_VALUE_FLOAT = b'updated_value(double)'
+_SIG_VALUE_INT = b'updated_value(int)'
+_SIG_VALUE_BOOL = b'updated_value(bool)'
+_SIG_TEXT_VALUE = b'updated_text_value(QString)'
+_SIG_CHOICE_INDEX = b'updated_choice_index_value(int)'
 
 
 class LoggedQuantity(QtCore.QObject):
@@ -62,10 +145,27 @@ class LoggedQuantity(QtCore.QObject):
      
     # signal sent when min max range updated
     updated_min_max = QtCore.Signal((float,float),(int,int), (),)
-    # signal sent when read only (ro) status has changed 
-    updated_readonly = QtCore.Signal((bool,), (),) 
+    # signal sent when read only (ro) status has changed
+    updated_readonly = QtCore.Signal((bool,), (),)
+    # internal: asks the LQ's own (gui) thread to deliver coalesced updates
+    _coalesce_flush_requested = QtCore.Signal()
+
+    # coalesced update mode, see enable_coalesced_updates()
+    coalesce_period = None
+    suppressed_emissions = 0
+    _coalesce_pending = False
+    _last_emit_time = 0.0
     
-    def __init__(self, name, dtype=float, 
+    # LQHistory, see enable_history()
+    history_buffer = None
+    
+    # period (s) of background read_from_hardware calls, see hardware_polling.py
+    poll_period = None
+    
+    # signal signature --> number of connected receivers, None if unknown
+    _receiver_counts = None
+
+    def __init__(self, name, dtype=float,
                  #hardware_read_func=None, hardware_set_func=None, 
                  initial=0, fmt="%g", si=False,
                  ro = False, # read only flag
@@ -77,8 +177,10 @@ class LoggedQuantity(QtCore.QObject):
                  description = None,
                  colors = None,
                  protected = False,
+                 poll_period = None,
                  ):
         QtCore.QObject.__init__(self)
+        self._receiver_counts = dict() # signal signature --> number of connections
         
         self.name = name
         
@@ -153,6 +255,7 @@ class LoggedQuantity(QtCore.QObject):
         
         self.path = ""
         self.protected = protected # a guard that prevents from being updated, i.e. file loading
+        self.poll_period = poll_period
 
 
     def coerce_to_type(self, x):
@@ -202,7 +305,8 @@ class LoggedQuantity(QtCore.QObject):
 
     
     def read_from_hardware(self, send_signal=True):
-        self.log.debug("{}: read_from_hardware send_signal={}".format(self.name, send_signal))
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug("{}: read_from_hardware send_signal={}".format(self.name, send_signal))
         if self.hardware_read_func is not None:        
             with self.lock:
                 self.oldval = self.val
@@ -269,15 +373,20 @@ class LoggedQuantity(QtCore.QObject):
     
             self.oldval = self.coerce_to_type(self.val)
             new_val = self.coerce_to_type(new_val)
+            if self.history_buffer is not None:
+                self.history_buffer.append(new_val)
             
-            self.log.debug("{}: update_value {} --> {}    sender={}".format(
-                            self.name, repr(self.oldval), repr(new_val), repr(self.sender())))
+            debug = self.log.isEnabledFor(logging.DEBUG)
+            if debug:
+                self.log.debug("{}: update_value {} --> {}    sender={}".format(
+                                self.name, repr(self.oldval), repr(new_val), repr(self.sender())))
     
             # check for equality of new vs old, do not proceed if they are same
             if self.same_values(self.oldval, new_val):
-                self.log.debug("{}: same_value so returning {} {}".format(self.name, self.oldval, new_val))
+                if debug:
+                    self.log.debug("{}: same_value so returning {} {}".format(self.name, self.oldval, new_val))
                 return
-            else:
+            elif debug:
                 self.log.debug("{}: different values {} {}".format(self.name, self.oldval, new_val))
                 
             # actually change internal state value
@@ -292,7 +401,70 @@ class LoggedQuantity(QtCore.QObject):
         # Send Qt Signals
         if send_signal:
             self.send_display_updates()
-            
+
+    def update_value_fast(self, new_val, update_hardware=True, send_signal=True):
+        """
+        Lightweight version of :meth:`update_value` for hot loops,
+        e.g. moving a stage once per pixel in a scan.
+        
+        Skips debug logging, the Qt sender lookup and the re-coercion of
+        the stored value. Still thread-safe: the value is compared and 
+        stored under self.lock. *new_val* must be given explicitly.
+        
+        =============== =================================================
+        **Arguments:**  **Description:**
+        new_val         New value for the LoggedQuantity to store
+        update_hardware calls hardware_set_func if defined (default True)
+        send_signal     sends out Qt signals upon change (default True)
+        =============== =================================================
+        
+        :returns: None
+        """
+        new_val = self.coerce_to_type(new_val)
+        if self.history_buffer is not None:
+            self.history_buffer.append(new_val)
+        with self.lock:
+            if self.same_values(self.val, new_val):
+                return
+            self.oldval = self.val
+            self.val = new_val
+        if update_hardware and self.hardware_set_func:
+            self.hardware_set_func(new_val)
+            if self.reread_from_hardware_after_write:
+                self.read_from_hardware(send_signal=False)
+        if send_signal:
+            self.send_display_updates()
+
+    def enable_history(self, maxlen=1000, dtype=None):
+        """
+        Keep a time series of the last *maxlen* values of this LQ in a
+        preallocated ring buffer (:attr:`history_buffer`).
+        
+        Every call to :meth:`update_value` (including :meth:`read_from_hardware`)
+        records a (timestamp, value) sample, also if the value did not change.
+        
+        ==============  ==========================================================
+        **Arguments:**  **Description:**
+        maxlen          number of samples kept
+        dtype           numpy dtype of stored values, defaults to float for
+                        numeric and bool LQs, object otherwise
+        ==============  ==========================================================
+        """
+        if dtype is None:
+            dtype = float if self.dtype in (float, int, bool) else object
+        self.history_buffer = LQHistory(maxlen, dtype, shape=np.shape(self.val))
+
+    def disable_history(self):
+        self.history_buffer = None
+
+    def history(self, since=None, max_points=None):
+        """
+        returns (times, values) arrays of recorded values in chronological
+        order, see :meth:`enable_history` and :meth:`LQHistory.get`
+        """
+        assert self.history_buffer is not None, "{}: history not enabled".format(self.name)
+        return self.history_buffer.get(since=since, max_points=max_points)
+
     def send_display_updates(self, force=False):
         """
         Emit updated_value signals if value has changed.
@@ -306,19 +478,29 @@ class LoggedQuantity(QtCore.QObject):
         
         """
         #self.log.debug("{}:send_display_updates: force={}. From {} to {}".format(self.name, force, self.oldval, self.val))
+        if self._defer_coalesced_emission(force):
+            return
         if (not self.same_values(self.oldval, self.val)) or (force):
-            self.updated_value[()].emit()
+            self._last_emit_time = time.monotonic()
+            # only convert and emit for signal overloads that are connected
+            has_receivers = self.has_receivers
+            if has_receivers(_SIG_VALUE):
+                self.updated_value[()].emit()
             
-            str_val = self.string_value()
-            self.updated_value[str].emit(str_val)
-            self.updated_text_value.emit(str_val)
+            if has_receivers(_SIG_VALUE_STR) or has_receivers(_SIG_TEXT_VALUE):
+                str_val = self.string_value()
+                self.updated_value[str].emit(str_val)
+                self.updated_text_value.emit(str_val)
                 
             if self.dtype in [float, int]:
-                self.updated_value[float].emit(self.val)
-                self.updated_value[int].emit(int(self.val))
-            self.updated_value[bool].emit(bool(self.val))
+                if has_receivers(_SIG_VALUE_FLOAT):
+                    self.updated_value[float].emit(self.val)
+                if has_receivers(_SIG_VALUE_INT):
+                    self.updated_value[int].emit(int(self.val))
+            if has_receivers(_SIG_VALUE_BOOL):
+                self.updated_value[bool].emit(bool(self.val))
             
-            if self.choices is not None:
+            if self.choices is not None and has_receivers(_SIG_CHOICE_INDEX):
                 choice_vals = [c[1] for c in self.choices]
                 if self.val in choice_vals:
                     self.updated_choice_index_value.emit(choice_vals.index(self.val) )
@@ -326,7 +508,93 @@ class LoggedQuantity(QtCore.QObject):
         else:
             # no updates sent
             pass
-    
+
+    def connectNotify(self, signal):
+        if self._receiver_counts is not None:
+            sig = signal.methodSignature().data()
+            self._receiver_counts[sig] = self._receiver_counts.get(sig, 0) + 1
+        
+    def disconnectNotify(self, signal):
+        if self._receiver_counts is None:
+            return
+        sig = signal.methodSignature().data()
+        if not sig:
+            # everything was disconnected at once, stop tracking
+            self._receiver_counts = None
+        elif self._receiver_counts.get(sig, 0) > 0:
+            self._receiver_counts[sig] -= 1
+    
+    def has_receivers(self, signature):
+        """
+        True if a signal with *signature* (e.g. b'updated_value(QString)') 
+        has connected receivers. Used to skip value conversions nobody listens to.
+        """
+        if self._receiver_counts is None:
+            return True
+        return self._receiver_counts.get(signature, 0) > 0
+
+    def enable_coalesced_updates(self, max_rate=10.0):
+        """
+        Rate limit the updated_value signals caused by updates from
+        worker threads (e.g. a Measurement.run loop).
+
+        Values are always stored immediately, but signals are emitted at most
+        *max_rate* times per second. An update that arrives too early is
+        suppressed and the latest value is delivered later from the
+        LQ's own (gui) thread. Updates from the gui thread are never delayed.
+
+        The number of suppressed emissions is counted in
+        :attr:`suppressed_emissions`
+
+        =============  ==========================================
+        **Arguments**  **Description**
+        *max_rate*     maximum number of emissions per second
+        =============  ==========================================
+        """
+        assert max_rate > 0
+        if not hasattr(self, '_coalesce_timer'):
+            self._coalesce_timer = QtCore.QTimer(self)
+            self._coalesce_timer.setSingleShot(True)
+            self._coalesce_timer.timeout.connect(self.flush_coalesced_updates)
+            self._coalesce_flush_requested.connect(self._start_coalesce_timer,
+                                                   QtCore.Qt.QueuedConnection)
+        self.coalesce_period = 1.0/max_rate
+
+    def disable_coalesced_updates(self):
+        """Return to emitting signals on every update, sends pending updates"""
+        self.coalesce_period = None
+        self.flush_coalesced_updates()
+
+    def flush_coalesced_updates(self):
+        """Emit the latest value if updates have been suppressed"""
+        if self._coalesce_pending:
+            self._coalesce_pending = False
+            self.send_display_updates(force=True)
+
+    def _start_coalesce_timer(self):
+        if self._coalesce_timer.isActive():
+            return
+        period = self.coalesce_period or 0
+        wait = period - (time.monotonic() - self._last_emit_time)
+        self._coalesce_timer.start(max(0, int(wait*1000)))
+
+    def _defer_coalesced_emission(self, force=False):
+        """
+        returns True if the emission should be skipped because the
+        LQ is in coalesced mode, in which case a later flush is scheduled
+        """
+        if self.coalesce_period is None or force:
+            return False
+        if QtCore.QThread.currentThread() == self.thread():
+            return False
+        if time.monotonic() - self._last_emit_time >= self.coalesce_period:
+            return False
+        self.suppressed_emissions += 1
+        if not self._coalesce_pending:
+            self._coalesce_pending = True
+            self._coalesce_flush_requested.emit()
+        return True
+
     def same_values(self, v1, v2):
         """ 
         Compares two values of the LQ type, used in update_value
@@ -1052,7 +1320,9 @@ class LoggedQuantity(QtCore.QObject):
         new_val = f(lq1, lq2, ...)
 
         when any of the lqs change, the value of this derived LQ
-        will be updated based on func
+        will be updated based on func. Derived LQs are evaluated by
+        :data:`lq_math_graph` in dependency order, once per change of their
+        inputs, circular dependencies raise a ValueError.
         
         reverse_func allows changes to this LQ to update lqs via reverse func
         
@@ -1079,6 +1349,9 @@ class LoggedQuantity(QtCore.QObject):
             #print(self.name, "update_math", lq_vals, "-->", new_val, )
             self.update_value(new_val)
         
+        # raises ValueError if this would create a circular dependency
+        lq_math_graph.add(self, self.math_lqs, update_math)
+        
         if reverse_func:
             def update_math_reverse():
                 lq_vals = [lq.value for lq in self.math_lqs]
@@ -1095,9 +1368,8 @@ class LoggedQuantity(QtCore.QObject):
                 for lq, new_val in zip(self.math_lqs, new_vals):
                     lq.update_value(new_val)
                     
-        for lq in self.math_lqs:
-            lq.updated_value[()].connect(update_math)
-            if reverse_func:
+        if reverse_func:
+            for lq in self.math_lqs:
                 self.add_listener(update_math_reverse)
                 
         update_math()
@@ -1228,6 +1500,12 @@ class FileLQ(LoggedQuantity):
 
 class ArrayLQ(LoggedQuantity):
     updated_shape = QtCore.Signal(str)
+    # emits the changed region as a tuple of (start, stop) per axis,
+    # or None if the whole array may have changed
+    updated_region = QtCore.Signal(object)
+    
+    # region changed by update_slice since last send_display_updates
+    _dirty_region = None
     
     def __init__(self, name, dtype=float, 
                  #hardware_read_func=None, hardware_set_func=None, 
@@ -1238,6 +1516,7 @@ class ArrayLQ(LoggedQuantity):
                  description=None,
                  protected=False):
         QtCore.QObject.__init__(self)
+        self._receiver_counts = dict() # signal signature --> number of connections
         
         self.name = name
         self.dtype = dtype
@@ -1266,7 +1545,7 @@ class ArrayLQ(LoggedQuantity):
             self.spinbox_decimals = 2
         self.reread_from_hardware_after_write = False
         
-        self.oldval = None
+        self.oldval = self.val
         
         self._in_reread_loop = False # flag to prevent reread from hardware loops
         
@@ -1305,28 +1584,77 @@ class ArrayLQ(LoggedQuantity):
             #print repr(x)
         return np.array(x, dtype=self.dtype)
     
+    def update_slice(self, idx, values, update_hardware=True, send_signal=True):
+        """
+        Update part of the array in place, e.g. arr_lq.update_slice((slice(0,10), 3), 0.0)
+        
+        Only the selected region is compared and written, no copy of the
+        array is made. The changed region is sent with :attr:`updated_region`
+        so that views can redraw only the affected elements. The string 
+        representation is only computed if a text widget is connected.
+        
+        Note: since the array is modified in place, references to
+        :attr:`val` held elsewhere see the change.
+        
+        =============== =================================================
+        **Arguments:**  **Description:**
+        idx             numpy index (int, slice or tuple of them)
+        values          new values for self.val[idx], broadcast as numpy
+        update_hardware calls hardware_set_func with the full array
+        send_signal     sends out Qt signals upon change (default True)
+        =============== =================================================
+        """
+        with self.lock:
+            values = np.asarray(values, dtype=self.val.dtype)
+            if np.all(self.val[idx] == values):
+                return
+            self.val[idx] = values
+            region = index_region(idx, self.val.shape)
+            if self._dirty_region is None:
+                self._dirty_region = region
+            else:
+                self._dirty_region = tuple((min(a0, b0), max(a1, b1)) 
+                                           for (a0, a1), (b0, b1) in zip(self._dirty_region, region))
+            if self.history_buffer is not None:
+                self.history_buffer.append(self.val)
+        if update_hardware and self.hardware_set_func:
+            self.hardware_set_func(self.val)
+        if send_signal:
+            self.send_display_updates()
+
     def send_display_updates(self, force=False):
-        with self.lock:            
+        if self._defer_coalesced_emission(force):
+            return
+        with self.lock:
             self.log.debug(self.name + ' send_display_updates')
             #print "send_display_updates: {} force={}".format(self.name, force)
-            if force or np.any(self.oldval != self.val):
-                
-                #print "send display updates", self.name, self.val, self.oldval
+            region, self._dirty_region = self._dirty_region, None
+            if self.oldval is not self.val:
+                # value has been replaced as a whole by update_value
+                if not (force or region is not None or self.oldval is None 
+                        or not self.same_values(self.oldval, self.val)):
+                    self.log.debug(self.name + ' send_display_updates skipped, same values')
+                    return
+                region = None
+            elif region is None and not force:
+                self.log.debug(self.name + ' send_display_updates skipped, no change')
+                return
+            self._last_emit_time = time.monotonic()
+            # only format string if a text consumer is connected
+            if self.has_receivers(_SIG_VALUE_STR) or self.has_receivers(_SIG_TEXT_VALUE):
                 str_val = self.string_value()
                 self.updated_value[str].emit(str_val)
                 self.updated_text_value.emit(str_val)
-                    
-                #self.updated_value[float].emit(self.val)
-                #if self.dtype != float:
-                #    self.updated_value[int].emit(self.val)
-                #self.updated_value[bool].emit(self.val)
-                self.updated_value[()].emit()
                 
-                self.oldval = self.val
-            else:
-                self.log.debug(self.name + ' send_display_updates skipped (olval!=self.val)={} force={} oldval={} val={}'.format(
-                    (self.oldval != self.val) , (force), self.oldval, self.val))
-                #print "\t no updates sent", (self.oldval != self.val) , (force), self.oldval, self.val
+            #self.updated_value[float].emit(self.val)
+            #if self.dtype != float:
+            #    self.updated_value[int].emit(self.val)
+            #self.updated_value[bool].emit(self.val)
+            if self.has_receivers(_SIG_VALUE):
+                self.updated_value[()].emit()
+            self.updated_region.emit(region)
+            
+            self.oldval = self.val
     
     @property
     def array_tableView(self):
@@ -1360,9 +1688,7 @@ class ArrayLQ(LoggedQuantity):
                 new_val = lq.value
                 if new_val == old_val:
                     return
-                new_arr = arr_lq.value.copy()
-                new_arr[index] = new_val 
-                arr_lq.update_value(new_arr)
+                arr_lq.update_slice(index, new_val)
 
             lq.add_listener(on_element_follower_lq)
 
@@ -1373,6 +1699,349 @@ class ArrayLQ(LoggedQuantity):
         return widget
 
 
+LQDescriptor = namedtuple('LQDescriptor', 
+                          ['dtype', 'fmt', 'si', 'unit', 'vmin', 'vmax', 'choices', 
+                           'description', 'spinbox_decimals', 'spinbox_step', 'colors'])
+LQDescriptor.__doc__ = "immutable metadata of a HeadlessLQ, shared between LQs with equal metadata"
+
+_lq_descriptor_cache = dict()
+
+def get_lq_descriptor(**kwargs):
+    """returns a cached :class:`LQDescriptor`, lists are stored as tuples"""
+    for key in ('choices', 'colors'):
+        if kwargs.get(key) is not None:
+            kwargs[key] = tuple(kwargs[key])
+    desc = LQDescriptor(**kwargs)
+    try:
+        return _lq_descriptor_cache.setdefault(desc, desc)
+    except TypeError: # unhashable metadata, do not share
+        return desc
+
+
+class LQSignals(QtCore.QObject):
+    """Qt signals of a HeadlessLQ, only created once something connects"""
+    updated_value = QtCore.Signal((float,),(int,),(bool,), (), (str,),) 
+    updated_text_value = QtCore.Signal(str) 
+    updated_choice_index_value = QtCore.Signal(int)
+    updated_min_max = QtCore.Signal((float,float),(int,int), (),)
+    updated_readonly = QtCore.Signal((bool,), (),)
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+        self.listeners = []
+
+
+class HeadlessLQ(object):
+    """
+    Lightweight, non-QObject LoggedQuantity for non-gui contexts (scripts, 
+    sequencer workers, tests), created by LQCollection(headless=True).
+    
+    Metadata (dtype, unit, vmin/vmax, choices, ...) is stored in a shared
+    :class:`LQDescriptor`. Qt signals live in an :class:`LQSignals` object
+    that is only created when something connects (e.g. :meth:`add_listener`),
+    until then updates emit nothing. All HeadlessLQs share one lock unless
+    :attr:`lock` is replaced (e.g. by HardwareComponent.thread_lock_all_lq).
+    Widgets are not supported.
+    """
+    __slots__ = ('name', 'desc', 'val', 'oldval', 'ro', 'protected', 'path',
+                 'hardware_read_func', 'hardware_set_func', 
+                 'reread_from_hardware_after_write', '_lock', '_signals',
+                 'math_lqs', 'math_func', 'reverse_math_func', 'reverse_func_num_params',
+                 '__weakref__')
+    
+    is_array = False
+    poll_period = None
+    history_buffer = None
+    log = logging.getLogger("HeadlessLQ")
+    _shared_lock = QLock(mode=1)
+
+    def __init__(self, name, dtype=float, initial=0, fmt="%g", si=False,
+                 ro=False, unit=None, spinbox_decimals=2, spinbox_step=0.1,
+                 vmin=-1e12, vmax=+1e12, choices=None,
+                 reread_from_hardware_after_write=False, description=None,
+                 colors=None, protected=False):
+        if dtype in ['int', 'uint']:
+            dtype = int
+        elif dtype in ['float', 'float32']:
+            dtype = float
+        if dtype == str:
+            fmt = "%s"
+        if dtype == int:
+            spinbox_decimals = 0
+            spinbox_step = 1
+        self.name = name
+        self.desc = get_lq_descriptor(dtype=dtype, fmt=fmt, si=si, unit=unit, vmin=vmin, vmax=vmax,
+                                      choices=None, description=description,
+                                      spinbox_decimals=spinbox_decimals, 
+                                      spinbox_step=spinbox_step, colors=colors)
+        choices = self._expand_choices(choices)
+        if choices:
+            self.desc = get_lq_descriptor(**dict(self.desc._asdict(), choices=choices))
+            if not initial in (x[1] for x in choices):
+                initial = choices[0][1]
+        self.val = dtype(initial)
+        self.oldval = None
+        self.ro = ro
+        self.protected = protected
+        self.path = ""
+        self.hardware_read_func = None
+        self.hardware_set_func = None
+        self.reread_from_hardware_after_write = reread_from_hardware_after_write
+        self._lock = None
+        self._signals = None
+
+    @property
+    def lock(self):
+        return self._lock or self._shared_lock
+
+    @lock.setter
+    def lock(self, lock):
+        self._lock = lock
+
+    @property
+    def signals(self):
+        if self._signals is None:
+            self._signals = LQSignals()
+        return self._signals
+
+    updated_value = property(lambda self: self.signals.updated_value)
+    updated_text_value = property(lambda self: self.signals.updated_text_value)
+    updated_choice_index_value = property(lambda self: self.signals.updated_choice_index_value)
+    updated_min_max = property(lambda self: self.signals.updated_min_max)
+    updated_readonly = property(lambda self: self.signals.updated_readonly)
+    listeners = property(lambda self: self.signals.listeners)
+
+    def update_value(self, new_val=None, update_hardware=True, send_signal=True, reread_hardware=None):
+        """see :meth:`LoggedQuantity.update_value`"""
+        if reread_hardware is None:
+            reread_hardware = self.reread_from_hardware_after_write
+        new_val = self.coerce_to_type(new_val)
+        with self.lock:
+            if self.same_values(self.val, new_val):
+                return
+            self.oldval = self.val
+            self.val = new_val
+        if update_hardware and self.hardware_set_func:
+            self.hardware_set_func(self.val)
+            if reread_hardware:
+                self.read_from_hardware(send_signal=False)
+        if send_signal:
+            self.send_display_updates()
+
+    def update_value_fast(self, new_val, update_hardware=True, send_signal=True):
+        self.update_value(new_val, update_hardware, send_signal)
+
+    def send_display_updates(self, force=False):
+        if self._signals is None:
+            # nothing connected
+            self.oldval = self.val
+            return
+        if (not self.same_values(self.oldval, self.val)) or force:
+            sig = self._signals
+            sig.updated_value[()].emit()
+            str_val = self.string_value()
+            sig.updated_value[str].emit(str_val)
+            sig.updated_text_value.emit(str_val)
+            if self.dtype in [float, int]:
+                sig.updated_value[float].emit(self.val)
+                sig.updated_value[int].emit(int(self.val))
+            sig.updated_value[bool].emit(bool(self.val))
+            if self.choices is not None:
+                choice_vals = [c[1] for c in self.choices]
+                if self.val in choice_vals:
+                    sig.updated_choice_index_value.emit(choice_vals.index(self.val))
+            self.oldval = self.val
+
+    def add_listener(self, func, argtype=(), **kwargs):
+        self.updated_value[argtype].connect(func, **kwargs)
+        self.listeners.append(func)
+
+    def change_choice_list(self, choices, new_val=None):
+        self.desc = get_lq_descriptor(**dict(self.desc._asdict(), 
+                                             choices=self._expand_choices(choices)))
+        if not self.choices:
+            return
+        if new_val is None:
+            new_val = self.val
+        values = [x[1] for x in self.choices]
+        if not new_val in values:
+            new_val = values[0]
+        self.update_value(new_val)
+        self.send_display_updates(force=True)
+
+    def change_min_max(self, vmin=-1e12, vmax=+1e12):
+        self.desc = get_lq_descriptor(**dict(self.desc._asdict(), vmin=vmin, vmax=vmax))
+        if self._signals is not None:
+            self._signals.updated_min_max.emit(vmin, vmax)
+
+    def change_readonly(self, ro=True):
+        self.ro = ro
+        if self._signals is not None:
+            self._signals.updated_readonly.emit(ro)
+
+    def change_unit(self, unit):
+        self.desc = get_lq_descriptor(**dict(self.desc._asdict(), unit=unit))
+
+    # methods shared with LoggedQuantity
+    coerce_to_type = LoggedQuantity.coerce_to_type
+    coerce_to_str = LoggedQuantity.coerce_to_str
+    _expand_choices = LoggedQuantity._expand_choices
+    __str__ = LoggedQuantity.__str__
+    __repr__ = LoggedQuantity.__repr__
+    read_from_hardware = LoggedQuantity.read_from_hardware
+    write_to_hardware = LoggedQuantity.write_to_hardware
+    value = LoggedQuantity.value
+    same_values = LoggedQuantity.same_values
+    string_value = LoggedQuantity.string_value
+    ini_string_value = LoggedQuantity.ini_string_value
+    update_choice_index_value = LoggedQuantity.update_choice_index_value
+    is_connected_to_hardware = LoggedQuantity.is_connected_to_hardware
+    has_hardware_read = LoggedQuantity.has_hardware_read
+    has_hardware_write = LoggedQuantity.has_hardware_write
+    connect_to_hardware = LoggedQuantity.connect_to_hardware
+    disconnect_from_hardware = LoggedQuantity.disconnect_from_hardware
+    connect_lq_math = LoggedQuantity.connect_lq_math
+    read_from_lq_math = LoggedQuantity.read_from_lq_math
+    set_path = LoggedQuantity.set_path
+
+# read-only access to the shared metadata, e.g. lq.unit
+for _field in LQDescriptor._fields:
+    setattr(HeadlessLQ, _field, property(lambda self, _field=_field: getattr(self.desc, _field)))
+
+
+def index_region(idx, shape):
+    """
+    returns the bounding box of numpy index *idx* into an array of *shape* as
+    a tuple of (start, stop) per axis. Fancy indexes give the whole array.
+    """
+    if not isinstance(idx, tuple):
+        idx = (idx,)
+    full = tuple((0, n) for n in shape)
+    if len(idx) > len(shape):
+        return full
+    region = []
+    for i, n in zip(idx, shape):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(n)
+            if step < 0:
+                start, stop = stop + 1, start + 1
+            region.append((start, max(start, stop)))
+        elif isinstance(i, (int, np.integer)):
+            i = int(i) % n
+            region.append((i, i + 1))
+        else:
+            return full
+    return tuple(region) + full[len(idx):]
+
+
+class LQDependencyGraph(object):
+    """
+    Evaluation engine for derived LQs (see :meth:`LoggedQuantity.connect_lq_math`)
+    
+    When an input LQ changes, all LQs derived from it (directly or through
+    other derived LQs) are recomputed once each, in topological order, so
+    that no derived LQ sees a partially updated set of inputs.
+    Changes made inside a :meth:`batch` block are propagated together at 
+    the end of the block.
+    
+    The module level instance :data:`lq_math_graph` is used by all LQs.
+    """
+
+    def __init__(self):
+        self.inputs = weakref.WeakKeyDictionary() # derived lq --> tuple of input lqs
+        self.update_funcs = weakref.WeakKeyDictionary() # derived lq --> func that recomputes it
+        self.dependents = weakref.WeakKeyDictionary() # lq --> list of lqs derived from it
+        self.n_evaluations = 0
+        self._changed = []
+        self._depth = 0
+
+    def add(self, derived, inputs, update_func):
+        """
+        register *derived* to be recomputed by *update_func* when any of *inputs* change,
+        replaces previous inputs of *derived*. Raises ValueError on circular dependencies.
+        """
+        inputs = tuple(inputs)
+        downstream = set(self.downstream([derived]))
+        for lq in inputs:
+            if lq is derived or lq in downstream:
+                raise ValueError("connect_lq_math: circular dependency {} <--> {}".format(
+                    derived.name, lq.name))
+        self.remove(derived)
+        self.inputs[derived] = inputs
+        self.update_funcs[derived] = update_func
+        for lq in inputs:
+            if lq not in self.dependents:
+                self.dependents[lq] = []
+                lq.updated_value[()].connect(lambda lq=lq: self.on_changed(lq))
+            self.dependents[lq].append(derived)
+
+    def remove(self, derived):
+        for lq in self.inputs.pop(derived, ()):
+            self.dependents[lq].remove(derived)
+        self.update_funcs.pop(derived, None)
+
+    def downstream(self, lqs):
+        """returns all LQs derived from any of *lqs* in topological order"""
+        order = []
+        visited = set()
+        def visit(lq):
+            for d in self.dependents.get(lq, ()):
+                if d not in visited:
+                    visited.add(d)
+                    visit(d)
+                    order.append(d)
+        for lq in lqs:
+            visit(lq)
+        return order[::-1]
+
+    def topological_order(self):
+        """all derived LQs, each after the LQs it depends on"""
+        roots = [lq for lq in self.dependents.keys() if lq not in self.inputs]
+        return self.downstream(roots)
+
+    def as_dict(self):
+        """returns dict of derived LQ path --> list of input LQ paths, for inspection"""
+        name = lambda lq: lq.path or lq.name
+        return OrderedDict((name(d), [name(lq) for lq in self.inputs[d]])
+                           for d in self.topological_order())
+
+    def on_changed(self, lq):
+        self._changed.append(lq)
+        if self._depth == 0:
+            with self.batch():
+                pass
+
+    @contextmanager
+    def batch(self):
+        """defer propagation of changes until the end of the (outermost) block"""
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            if self._depth == 1:
+                try:
+                    self._propagate()
+                finally:
+                    self._depth -= 1
+            else:
+                self._depth -= 1
+
+    def _propagate(self):
+        while self._changed:
+            changed, self._changed = self._changed, []
+            evaluated = self.downstream(changed)
+            for derived in evaluated:
+                self.n_evaluations += 1
+                self.update_funcs[derived]()
+            # downstream of the evaluated LQs has already been handled,
+            # other changes (e.g. by listeners) need another pass
+            evaluated = set(evaluated)
+            self._changed = [lq for lq in self._changed if lq not in evaluated]
+
+
+lq_math_graph = LQDependencyGraph()
+
+
 class LQCircularNetwork(QtCore.QObject):
     '''
     LQCircularNetwork is collection of logged quantities
@@ -1401,10 +2070,14 @@ class LQCircularNetwork(QtCore.QObject):
         '''
         if self.locked == False:
             self.locked = True
-            for kev,val in kwargs.items():
-                self.lq_dict[kev].update_value(val)
-                self.updated_values.emit()
+            try:
+                # derived (connect_lq_math) LQs are recomputed once at the end
+                with lq_math_graph.batch():
+                    for kev,val in kwargs.items():
+                        self.lq_dict[kev].update_value(val)
+            finally:
                 self.locked = False
+            self.updated_values.emit()
                 
     def add_lq(self, lq, name=None):
         if name is None:
@@ -1616,6 +2289,64 @@ class LQ3Vector(object):
 
 
 
+class LQBatchUpdate(object):
+    """
+    Applies a set of new values to logged quantities as one transaction.
+
+    Values are stored immediately, but hardware writes and Qt signals are
+    deferred until :meth:`apply` (or the end of a with block). Then each LQ
+    whose value actually changed is written to hardware once and emits its
+    signals once with its final value.
+
+    Example::
+
+        with LQBatchUpdate() as batch:
+            batch.update_value(stage.settings.x_position, 10)
+            batch.update_value(camera.settings.exposure, 0.1)
+    """
+
+    def __init__(self, update_hardware=True):
+        self.update_hardware = update_hardware
+        self.initial_values = OrderedDict() # lq --> value before the batch
+
+    def update_value(self, lq, new_val):
+        if lq not in self.initial_values:
+            self.initial_values[lq] = lq.val
+        lq.update_value(new_val, update_hardware=False, send_signal=False)
+
+    def changed_lqs(self):
+        return [lq for lq, val in self.initial_values.items()
+                if not lq.same_values(val, lq.val)]
+
+    def apply(self):
+        """
+        write each changed LQ to hardware and send its display updates
+
+        :returns: list of changed LQs
+        """
+        changed = self.changed_lqs()
+        self.initial_values.clear()
+        if self.update_hardware:
+            for lq in changed:
+                lq.write_to_hardware()
+        with lq_math_graph.batch():
+            for lq in changed:
+                lq.send_display_updates(force=True)
+        return changed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.apply()
+
+
+class LQCollectionSignals(QtCore.QObject):
+
+    # emitted once at the end of a batch update with names of changed LQs
+    settings_changed = QtCore.Signal(list)
+
+
 class LQCollection(object):
     """
     LQCollection is a smart dictionary of LoggedQuantity objects.
@@ -1629,15 +2360,29 @@ class LQCollection(object):
     
     LQRange objects can be created with :meth:`New_Range` and will be stored
     in :attr:ranges
-    
+
+    Many values can be set at once with :meth:`update_values` or inside a
+    :meth:`batch_update` block, :attr:`settings_changed` is then emitted once
+    with the names of the changed LQ's
+
     """
 
-    def __init__(self):
+    def __init__(self, headless=False):
+        """
+        if *headless*, New creates lightweight :class:`HeadlessLQ`
+        objects (for scalar settings) that do not support widgets
+        """
+        self.headless = headless
         self._logged_quantities = OrderedDict()
         self.ranges = OrderedDict()
         self.vectors = OrderedDict()
-        
+
         self.log = get_logger_from_class(self)
+
+        self._signals = LQCollectionSignals()
+        self.settings_changed = self._signals.settings_changed
+        self._batch = None
+        self._batch_depth = 0
         
     def New(self, name, dtype=float, **kwargs):
         """
@@ -1651,6 +2396,8 @@ class LQCollection(object):
         else:
             if dtype == 'file':
                 lq = FileLQ(name=name, **kwargs)
+            elif self.headless:
+                lq = HeadlessLQ(name=name, dtype=dtype, **kwargs)
             else:
                 lq = LoggedQuantity(name=name, dtype=dtype, **kwargs)
 
@@ -1705,7 +2452,44 @@ class LQCollection(object):
     
     def __setitem__(self, key, item):
         "Dictionary-like access reads and sets value of LQ's"
-        self._logged_quantities[key].update_value(item)
+        if self._batch is not None:
+            self._batch.update_value(self._logged_quantities[key], item)
+        else:
+            self._logged_quantities[key].update_value(item)
+
+    @contextmanager
+    def batch_update(self, update_hardware=True):
+        """
+        Context manager that defers hardware writes and signals of values set
+        with lqcoll[name] = val (or :meth:`update_values`) until the end of
+        the block. Then each changed LQ is written to hardware and updates its
+        display once, and :attr:`settings_changed` is emitted once.
+
+        Nested blocks are merged into the outermost one.
+        """
+        if self._batch is None:
+            self._batch = LQBatchUpdate(update_hardware=update_hardware)
+        self._batch_depth += 1
+        try:
+            yield self._batch
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                batch = self._batch
+                self._batch = None
+                changed = batch.apply()
+                if changed:
+                    self.settings_changed.emit([lq.name for lq in changed])
+
+    def update_values(self, values, update_hardware=True):
+        """
+        Set many values at once from a dictionary (name, value),
+        see :meth:`batch_update`. Unknown names are ignored.
+        """
+        with self.batch_update(update_hardware=update_hardware):
+            for name, val in values.items():
+                if name in self._logged_quantities:
+                    self[name] = val
 
     def __contains__(self, key):
         return self._logged_quantities.__contains__(key)
@@ -1877,6 +2661,27 @@ class LQCollection(object):
     def disconnect_all_from_hardware(self):
         for lq in self.as_list():
             lq.disconnect_from_hardware()
+
+    def enable_coalesced_updates(self, max_rate=10.0, include=None, exclude=[]):
+        """
+        Rate limit signal emission of LQ's updated from worker threads,
+        see :meth:`LoggedQuantity.enable_coalesced_updates`
+        """
+        if include is None:
+            include = self.keys()
+        for lqname in include:
+            if lqname in exclude:
+                continue
+            self.get_lq(lqname).enable_coalesced_updates(max_rate)
+
+    def disable_coalesced_updates(self):
+        for lq in self.as_list():
+            if lq.coalesce_period is not None:
+                lq.disable_coalesced_updates()
+
+    def suppressed_emissions(self):
+        """returns a dictionary (name, number of suppressed emissions)"""
+        return {name: lq.suppressed_emissions for name, lq in self.as_dict().items()}
             
 
 
@@ -92,16 +92,59 @@ class ArrayLQ_QTableModel(NumpyQTableModel):
         default_kwargs.update(kwargs)
         NumpyQTableModel.__init__(self, lq.val, parent=parent, **default_kwargs)
         self.lq = lq
-        self.lq.updated_value[()].connect(self.on_lq_updated_value)
+        self._updating_from_lq = False
+        self.lq.updated_region.connect(self.on_lq_updated_region)
         self.dataChanged.connect(self.on_dataChanged)
 
     def on_lq_updated_value(self):
         #print "ArrayLQ_QTableModel", self.lq.name, 'on_lq_updated_value'
         self.set_array(self.lq.val)
     
+    def on_lq_updated_region(self, region):
+        """copy only the changed region of the lq's array and emit dataChanged for it"""
+        if region is None or len(region) > 2 or self.lq.val.shape != self.original_shape:
+            self.on_lq_updated_value()
+            return
+        (r0, r1), (c0, c1) = self.table_region(region)
+        self._array[r0:r1, c0:c1] = self.table_view(self.lq.val)[r0:r1, c0:c1]
+        self._updating_from_lq = True
+        try:
+            self.dataChanged.emit(self.index(r0, c0), self.index(r1 - 1, c1 - 1))
+        finally:
+            self._updating_from_lq = False
+    
+    def table_view(self, arr):
+        "view of arr (with shape original_shape) in table (row, column) coordinates"
+        if arr.ndim == 1:
+            arr = arr[:, None]
+        if self.transpose:
+            arr = arr.T
+        return arr
+
+    def table_region(self, region):
+        "converts an array region ((start, stop), ...) to table ((row0, row1), (col0, col1))"
+        if len(region) == 1:
+            region = (region[0], (0, 1))
+        if self.transpose:
+            region = region[::-1]
+        return tuple(region)
+
     def on_dataChanged(self,topLeft=None, bottomRight=None):
         #print "ArrayLQ_QTableModel", self.lq.name, 'on_dataChanged'
-        self.lq.update_value(np.array(self.array))
+        if self._updating_from_lq:
+            return
+        if topLeft is None or bottomRight is None or len(self.original_shape) > 2:
+            self.lq.update_value(np.array(self.array))
+            return
+        # table region --> array index
+        region = ((topLeft.row(), bottomRight.row() + 1), 
+                  (topLeft.column(), bottomRight.column() + 1))
+        if self.transpose:
+            region = region[::-1]
+        if len(self.original_shape) == 1:
+            region = region[:1]
+        idx = tuple(slice(a, b) for a, b in region)
+        self.lq.update_slice(idx, np.array(self.array[idx]))
         #self.lq.send_display_updates(force=True)
     
     
@@ -125,8 +125,8 @@ class BaseRaster2DFrameSlowScan(BaseRaster2DScan):
         self.stage.y_position.update_value(y)
         
     def move_position_fast(self, x,y, dx, dy):
-        self.stage.x_position.update_value(x)
-        self.stage.y_position.update_value(y)
+        self.stage.x_position.update_value_fast(x)
+        self.stage.y_position.update_value_fast(y)
         #x = self.stage.settings['x_position']
         #y = self.stage.settings['y_position']        
         #x = self.stage.settings.x_position.read_from_hardware()
@@ -62,6 +62,9 @@ class BaseRaster2DSlowScan(BaseRaster2DScan):
                 self.pixel_time = np.zeros(self.scan_shape, dtype=float)
                 if self.settings['save_h5']:
                     self.pixel_time_h5 = H.create_dataset(name='pixel_time', shape=self.scan_shape, dtype=float)            
+                    # per pixel h5 writes are done in the background, 
+                    # collect_pixel can use self.h5_writer.write(dataset, index, data) as well
+                    self.h5_writer = h5_io.H5AsyncWriter(self.h5_file)
 
                 self.pre_scan_setup()
                 
@@ -88,7 +91,7 @@ class BaseRaster2DSlowScan(BaseRaster2DScan):
                         if self.interrupt_measurement_called: break
                         self.move_position_slow(h,v, dh, dv)
                         if self.settings['save_h5']:    
-                            self.h5_file.flush() # flush data to file every slow move
+                            self.h5_writer.flush() # flush data to file every slow move
                         #self.app.qtapp.ProcessEvents()
                         time.sleep(0.01)
                     else:
@@ -100,7 +103,7 @@ class BaseRaster2DSlowScan(BaseRaster2DScan):
                     pixel_t0 = time.time()
                     self.pixel_time[kk, jj, ii] = pixel_t0
                     if self.settings['save_h5']:
-                        self.pixel_time_h5[kk, jj, ii] = pixel_t0
+                        self.h5_writer.write(self.pixel_time_h5, (kk, jj, ii), pixel_t0)
                     self.collect_pixel(self.pixel_i, kk, jj, ii)
                     self.set_progress(100.0*self.pixel_i / (self.Npixels))
             except Exception as err:
@@ -110,6 +113,13 @@ class BaseRaster2DSlowScan(BaseRaster2DScan):
                 #raise(err)
             finally:
                 self.post_scan_cleanup()
+                if hasattr(self, 'h5_writer'):
+                    try:
+                        self.h5_writer.close()
+                        self.log.debug('h5_writer stats: {}'.format(self.h5_writer.stats))
+                    except Exception as err:
+                        self.log.error('failed to write h5 data: {}'.format(err))
+                    del self.h5_writer
                 if hasattr(self, 'h5_file'):
                     print('h5_file', self.h5_file)
                     try:
@@ -129,8 +139,8 @@ class BaseRaster2DSlowScan(BaseRaster2DScan):
         self.stage.settings.y_position.update_value(v)
         
     def move_position_fast(self, h,v, dh, dv):
-        self.stage.settings.x_position.update_value(h)
-        self.stage.settings.y_position.update_value(v)
+        self.stage.settings.x_position.update_value_fast(h)
+        self.stage.settings.y_position.update_value_fast(v)
         #x = self.stage.settings['x_position']
         #y = self.stage.settings['y_position']        
         #x = self.stage.settings.x_position.read_from_hardware()
@@ -212,6 +222,9 @@ class BaseRaster3DSlowScan(BaseRaster3DScan):
                 self.pixel_time = np.zeros(self.scan_shape, dtype=float)
                 if self.settings['save_h5']:
                     self.pixel_time_h5 = H.create_dataset(name='pixel_time', shape=self.scan_shape, dtype=float)            
+                    # per pixel h5 writes are done in the background, 
+                    # collect_pixel can use self.h5_writer.write(dataset, index, data) as well
+                    self.h5_writer = h5_io.H5AsyncWriter(self.h5_file)
 
                 self.pre_scan_setup()
                 
@@ -238,14 +251,14 @@ class BaseRaster3DSlowScan(BaseRaster3DScan):
                         if self.interrupt_measurement_called: break
                         self.move_position_start(h, v, z)
                         if self.settings['save_h5']:    
-                            self.h5_file.flush() # flush data to file every slow move
+                            self.h5_writer.flush() # flush data to file every slow move
                         #self.app.qtapp.ProcessEvents()
                         time.sleep(0.01)
                     elif self.scan_slow_move[i]:
                         if self.interrupt_measurement_called: break
                         self.move_position_slow(h, v, dh, dv)
                         if self.settings['save_h5']:    
-                            self.h5_file.flush() # flush data to file every slow move
+                            self.h5_writer.flush() # flush data to file every slow move
                         #self.app.qtapp.ProcessEvents()
                         time.sleep(0.01)
                     else:
@@ -257,7 +270,7 @@ class BaseRaster3DSlowScan(BaseRaster3DScan):
                     pixel_t0 = time.time()
                     self.pixel_time[kk, jj, ii] = pixel_t0
                     if self.settings['save_h5']:
-                        self.pixel_time_h5[kk, jj, ii] = pixel_t0
+                        self.h5_writer.write(self.pixel_time_h5, (kk, jj, ii), pixel_t0)
                     self.collect_pixel(self.pixel_i, kk, jj, ii)
                     self.set_progress(100.0*self.pixel_i / (self.Npixels))
             except Exception as err:
@@ -267,6 +280,13 @@ class BaseRaster3DSlowScan(BaseRaster3DScan):
                 #raise(err)
             finally:
                 self.post_scan_cleanup()
+                if hasattr(self, 'h5_writer'):
+                    try:
+                        self.h5_writer.close()
+                        self.log.debug('h5_writer stats: {}'.format(self.h5_writer.stats))
+                    except Exception as err:
+                        self.log.error('failed to write h5 data: {}'.format(err))
+                    del self.h5_writer
                 if hasattr(self, 'h5_file'):
                     print('h5_file', self.h5_file)
                     try:
@@ -287,8 +307,8 @@ class BaseRaster3DSlowScan(BaseRaster3DScan):
         self.stage.settings.y_position.update_value(v)
         
     def move_position_fast(self, h, v, dh, dv):
-        self.stage.settings.x_position.update_value(h)
-        self.stage.settings.y_position.update_value(v)
+        self.stage.settings.x_position.update_value_fast(h)
+        self.stage.settings.y_position.update_value_fast(v)
         #x = self.stage.settings['x_position']
         #y = self.stage.settings['y_position']        
         #x = self.stage.settings.x_position.read_from_hardware()
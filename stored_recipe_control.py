@@ -2,7 +2,7 @@ from ScopeFoundry import Measurement
 from ScopeFoundry.helper_funcs import sibling_path, load_qt_ui_file
 import configparser
 import time
-from ScopeFoundry.logged_quantity import LQCollection, LoggedQuantity
+from ScopeFoundry.logged_quantity import LQCollection, LoggedQuantity, LQBatchUpdate
 from collections import OrderedDict
 
 class BaseRecipeControl(Measurement):
@@ -171,8 +171,9 @@ class BaseRecipeControl(Measurement):
     def execute_current_recipe(self):
         # save first?
         # ask first?
-        for setting_name, (recipe_lq, current_lq) in self.settings_dict.items():
-            current_lq.update_value(recipe_lq.value)
+        with LQBatchUpdate() as batch:
+            for setting_name, (recipe_lq, current_lq) in self.settings_dict.items():
+                batch.update_value(current_lq, recipe_lq.value)
 
     
     
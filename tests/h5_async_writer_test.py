@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+import h5py
+import numpy as np
+
+from ScopeFoundry.h5_io import H5AsyncWriter
+
+
+class H5AsyncWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.h5_file = h5py.File(os.path.join(self.tmpdir.name, 'test.h5'), 'w')
+
+    def tearDown(self):
+        self.h5_file.close()
+        self.tmpdir.cleanup()
+
+    def test_serpentine_pixels(self):
+        ds = self.h5_file.create_dataset('pixel_time', shape=(1, 20, 30), dtype=float)
+        expected = np.zeros(ds.shape)
+        writer = H5AsyncWriter(self.h5_file)
+        for jj in range(20):
+            cols = range(30) if jj % 2 == 0 else range(29, -1, -1)
+            for ii in cols:
+                expected[0, jj, ii] = jj*100 + ii
+                writer.write(ds, (0, jj, ii), jj*100 + ii)
+            writer.flush()
+        writer.close()
+        np.testing.assert_array_equal(ds[:], expected)
+        stats = writer.stats
+        self.assertEqual(stats['n_writes'], 600)
+        self.assertLess(stats['n_hyperslab_writes'], 600)
+        self.assertGreater(stats['n_flushes'], 0)
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_spectra_and_fancy_index(self):
+        ds = self.h5_file.create_dataset('spec_map', shape=(4, 5, 16), dtype='uint16')
+        writer = H5AsyncWriter(self.h5_file, max_queue=3)
+        for jj in range(4):
+            for ii in range(5):
+                writer.write(ds, (jj, ii), np.full(16, jj*5 + ii))
+        writer.write(ds, (0, 0, [1, 3]), [100, 200])
+        writer.drain()
+        self.assertEqual(ds[3, 4, 0], 19)
+        self.assertEqual(list(ds[0, 0, :4]), [0, 100, 0, 200])
+        writer.close()
+
+    def test_error_is_raised(self):
+        ds = self.h5_file.create_dataset('d', shape=(10,), dtype=float)
+        writer = H5AsyncWriter(self.h5_file)
+        writer.write(ds, slice(0, 10), np.zeros(3))
+        with self.assertRaises(Exception):
+            writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import time
+
+from ScopeFoundry import BaseMicroscopeApp, HardwareComponent
+
+
+class SlowConnectHW(HardwareComponent):
+
+    connect_delay = 0.3
+
+    def setup(self):
+        self.settings.New('fail_on_connect', dtype=bool, initial=False)
+
+    def connect(self):
+        time.sleep(self.connect_delay)
+        if self.settings['fail_on_connect']:
+            raise IOError("CONNECT FAIL!")
+        self.app.events.append(('connect', self.name))
+
+    def disconnect(self):
+        self.app.events.append(('disconnect', self.name))
+
+
+class ConnectAllTestApp(BaseMicroscopeApp):
+
+    name = 'connect_all_test_app'
+
+    def setup(self):
+        self.events = []
+        for name in ['controller', 'camera', 'laser']:
+            self.add_hardware(SlowConnectHW(self, name=name))
+        stage = self.add_hardware(SlowConnectHW(self, name='stage'))
+        stage.depends_on = ['controller']
+
+
+class ConnectAllTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = ConnectAllTestApp([])
+
+    def tearDown(self):
+        self.app.hardware_poller.stop()
+
+    def test_parallel_connect(self):
+        t0 = time.perf_counter()
+        report = self.app.connect_all(parallel=True)
+        dt = time.perf_counter() - t0
+        # controller/camera/laser concurrently, then stage
+        self.assertLess(dt, 1.0)
+        self.assertEqual(set(report.keys()), {'controller', 'camera', 'laser', 'stage'})
+        for name, r in report.items():
+            self.assertEqual(r['status'], 'connected')
+            self.assertGreaterEqual(r['time'], 0.3)
+            self.assertTrue(self.app.hardware[name].settings['connected'])
+        events = self.app.events
+        self.assertLess(events.index(('connect', 'controller')), events.index(('connect', 'stage')))
+
+        self.app.events.clear()
+        report = self.app.disconnect_all(parallel=True)
+        self.assertTrue(all(r['status'] == 'disconnected' for r in report.values()))
+        events = self.app.events
+        self.assertLess(events.index(('disconnect', 'stage')), events.index(('disconnect', 'controller')))
+        for hw in self.app.hardware.values():
+            self.assertFalse(hw.settings['connected'])
+
+    def test_failed_dependency(self):
+        self.app.hardware['controller'].settings['fail_on_connect'] = True
+        for parallel in (True, False):
+            report = self.app.connect_all(parallel=parallel)
+            self.assertEqual(report['controller']['status'], 'failed')
+            self.assertEqual(report['stage']['status'], 'skipped')
+            self.assertFalse(self.app.hardware['stage'].settings['connected'])
+
+    def test_circular_dependency(self):
+        self.app.hardware['controller'].depends_on = ['stage']
+        with self.assertRaises(ValueError):
+            self.app.connect_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
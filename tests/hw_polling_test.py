@@ -0,0 +1,75 @@
+import unittest
+import time
+
+from ScopeFoundry import BaseMicroscopeApp, HardwareComponent
+
+
+class PolledHW(HardwareComponent):
+
+    name = 'polled_hw'
+    read_delay = 0.0
+
+    def setup(self):
+        self.settings.New('value', dtype=float, ro=True, poll_period=0.02)
+        self.settings.New('not_polled', dtype=float, ro=True)
+        self.n_reads = 0
+
+    def read_value(self):
+        time.sleep(self.read_delay)
+        self.n_reads += 1
+        return self.n_reads
+
+    def connect(self):
+        self.settings.value.connect_to_hardware(read_func=self.read_value)
+        self.settings.not_polled.connect_to_hardware(read_func=self.read_value)
+
+    def disconnect(self):
+        self.settings.disconnect_all_from_hardware()
+
+
+class SlowHW(PolledHW):
+
+    name = 'slow_hw'
+    read_delay = 0.3
+
+
+class PollingTestApp(BaseMicroscopeApp):
+
+    name = 'polling_test_app'
+
+    def setup(self):
+        self.add_hardware(PolledHW(self))
+        self.add_hardware(SlowHW(self))
+
+
+class HardwarePollingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = PollingTestApp([])
+
+    def tearDown(self):
+        self.app.hardware_poller.stop()
+
+    def test_polling(self):
+        fast = self.app.hardware['polled_hw']
+        slow = self.app.hardware['slow_hw']
+        time.sleep(0.1)
+        self.assertEqual(fast.n_reads, 0) # not connected
+
+        fast.settings['connected'] = True
+        slow.settings['connected'] = True
+        time.sleep(0.7)
+        self.app.hardware_poller.stop()
+
+        stats = self.app.hardware_poller.get_stats()
+        self.assertNotIn('hw/polled_hw/not_polled', stats)
+        # the slow device does not hold up the fast one
+        self.assertGreater(stats['hw/polled_hw/value']['n_reads'], 10)
+        slow_stats = stats['hw/slow_hw/value']
+        self.assertLessEqual(slow_stats['n_reads'], 3)
+        self.assertGreater(slow_stats['missed_deadlines'], 0)
+        self.assertGreaterEqual(slow_stats['max_latency'], 0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
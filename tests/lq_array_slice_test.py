@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from ScopeFoundry import BaseApp
+from ScopeFoundry.ndarray_interactive import ArrayLQ_QTableModel
+
+
+class ArrayLQUpdateSliceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = BaseApp([])
+        self.lq = self.app.settings.New('mask', dtype=float, array=True,
+                                        initial=np.zeros((8, 4)))
+        self.regions = []
+        self.lq.updated_region.connect(self.regions.append)
+        self.n_updates = []
+        self.lq.add_listener(lambda: self.n_updates.append(1))
+
+    def test_update_slice(self):
+        val_before = self.lq.val
+        self.lq.update_slice((slice(2, 5), 1), 1.0)
+        self.assertIs(self.lq.val, val_before) # in place
+        self.assertEqual(self.lq.val[2:5, 1].sum(), 3.0)
+        self.assertEqual(self.regions, [((2, 5), (1, 2))])
+        self.assertEqual(len(self.n_updates), 1)
+        # no change, no signal
+        self.lq.update_slice((slice(2, 5), 1), 1.0)
+        self.assertEqual(len(self.regions), 1)
+
+    def test_full_update(self):
+        self.lq.update_value(np.ones((8, 4)))
+        self.assertEqual(self.regions, [None])
+
+    def test_text_only_formatted_for_consumers(self):
+        texts = []
+        self.lq.update_slice(0, 1.0)
+        self.lq.updated_text_value.connect(texts.append)
+        self.lq.update_slice(1, 2.0)
+        self.assertEqual(len(texts), 1)
+
+    def test_table_model(self):
+        model = ArrayLQ_QTableModel(self.lq)
+        changed = []
+        model.dataChanged.connect(lambda tl, br: changed.append(
+            (tl.row(), tl.column(), br.row(), br.column())))
+        self.lq.update_slice((3, slice(0, 2)), 5.0)
+        self.assertEqual(changed, [(3, 0, 3, 1)])
+        self.assertEqual(model.data(model.index(3, 1)), '5')
+        # editing a cell writes back only that element
+        model.setData(model.index(6, 2), '7')
+        self.assertEqual(self.lq.val[6, 2], 7.0)
+        self.assertEqual(self.regions[-1], ((6, 7), (2, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from ScopeFoundry import BaseApp
+from ScopeFoundry.logged_quantity import LQBatchUpdate
+
+
+class LQBatchUpdateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = BaseApp([])
+        S = self.app.settings
+        self.x = S.New('x', dtype=float, initial=0)
+        self.y = S.New('y', dtype=float, initial=0)
+        self.hw_writes = []
+        self.x.connect_to_hardware(write_func=lambda v: self.hw_writes.append(('x', v)))
+        self.y.connect_to_hardware(write_func=lambda v: self.hw_writes.append(('y', v)))
+        self.x_received = []
+        self.x.add_listener(self.x_received.append, argtype=(float,))
+        self.changed = []
+        S.settings_changed.connect(self.changed.append)
+
+    def test_batch_update(self):
+        with self.app.settings.batch_update():
+            self.app.settings['x'] = 1
+            self.app.settings['x'] = 2
+            self.app.settings['y'] = 3
+            # values are visible inside the block, side effects are not
+            self.assertEqual(self.x.val, 2)
+            self.assertEqual(self.hw_writes, [])
+            self.assertEqual(self.x_received, [])
+        self.assertEqual(self.hw_writes, [('x', 2), ('y', 3)])
+        self.assertEqual(self.x_received, [2])
+        self.assertEqual(self.changed, [['x', 'y']])
+
+    def test_unchanged_values_skipped(self):
+        self.app.settings.update_values({'x': 0, 'y': 5, 'not_a_setting': 1})
+        self.assertEqual(self.hw_writes, [('y', 5)])
+        self.assertEqual(self.x_received, [])
+        self.assertEqual(self.changed, [['y']])
+
+    def test_nested(self):
+        with self.app.settings.batch_update():
+            self.app.settings.update_values({'x': 1})
+            self.assertEqual(self.changed, [])
+            self.app.settings['y'] = 2
+        self.assertEqual(self.changed, [['x', 'y']])
+
+    def test_lq_batch_update(self):
+        with LQBatchUpdate(update_hardware=False) as batch:
+            batch.update_value(self.x, 4)
+        self.assertEqual(self.hw_writes, [])
+        self.assertEqual(self.x_received, [4])
+
+
+if __name__ == '__main__':
+    unittest.main()
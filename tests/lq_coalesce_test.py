@@ -0,0 +1,65 @@
+import unittest
+import threading
+import time
+
+from qtpy import QtWidgets
+from ScopeFoundry import BaseApp
+
+
+def process_events_for(dt):
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < dt:
+        QtWidgets.QApplication.processEvents()
+        time.sleep(0.005)
+
+
+class LQCoalesceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = BaseApp([])
+        self.lq = self.app.settings.New('detector_counts', dtype=float, initial=0)
+        self.received = []
+        self.lq.add_listener(self.received.append, argtype=(float,))
+
+    def update_from_thread(self, n):
+        def run():
+            for i in range(1, n+1):
+                self.lq.update_value(i)
+        t = threading.Thread(target=run)
+        t.start()
+        t.join()
+
+    def test_not_coalesced_by_default(self):
+        self.update_from_thread(100)
+        process_events_for(0.1)
+        self.assertEqual(len(self.received), 100)
+        self.assertEqual(self.lq.suppressed_emissions, 0)
+
+    def test_coalesced_worker_updates(self):
+        self.lq.enable_coalesced_updates(max_rate=10)
+        self.update_from_thread(1000)
+        self.assertEqual(self.lq.val, 1000)
+        self.assertGreater(self.lq.suppressed_emissions, 0)
+        process_events_for(0.3)
+        # the latest value is always delivered
+        self.assertEqual(self.received[-1], 1000)
+        self.assertLess(len(self.received), 10)
+
+    def test_gui_thread_updates_not_delayed(self):
+        self.lq.enable_coalesced_updates(max_rate=1)
+        for i in range(1, 11):
+            self.lq.update_value(i)
+        self.assertEqual(len(self.received), 10)
+
+    def test_collection_counters(self):
+        self.app.settings.enable_coalesced_updates(max_rate=10)
+        self.update_from_thread(50)
+        process_events_for(0.3)
+        counts = self.app.settings.suppressed_emissions()
+        self.assertEqual(counts['detector_counts'], self.lq.suppressed_emissions)
+        self.app.settings.disable_coalesced_updates()
+        self.assertEqual(self.received[-1], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Construction time and memory of 10k LoggedQuantities versus 10k 
+HeadlessLQs (LQCollection(headless=True)).
+
+RSS is read from /proc/self/statm (Linux only). Each variant is
+measured in its own process.
+
+run with:
+    python -m ScopeFoundry.tests.lq_headless_benchmark
+"""
+import os
+import subprocess
+import sys
+import time
+
+
+N = 10_000
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def measure(headless):
+    from qtpy import QtWidgets
+    from ScopeFoundry.logged_quantity import LQCollection
+    qtapp = QtWidgets.QApplication([])
+    settings = LQCollection(headless=headless)
+    rss0 = rss_bytes()
+    t0 = time.perf_counter()
+    for i in range(N):
+        settings.New('setting_{}'.format(i), dtype=float, initial=i, unit='V', vmin=0, vmax=10)
+    dt = time.perf_counter() - t0
+    drss = rss_bytes() - rss0
+    print("{:12} {:8.1f} us/LQ {:8.2f} kB/LQ".format(
+        'headless' if headless else 'QObject', 1e6*dt/N, drss/N/1024))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        measure(sys.argv[1] == 'headless')
+    else:
+        print("{} LQs".format(N))
+        for variant in ('qobject', 'headless'):
+            subprocess.run([sys.executable, '-m', 'ScopeFoundry.tests.lq_headless_benchmark', variant])
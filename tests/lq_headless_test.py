@@ -0,0 +1,51 @@
+import unittest
+
+from ScopeFoundry.logged_quantity import LQCollection, HeadlessLQ
+
+
+class HeadlessLQTest(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = LQCollection(headless=True)
+
+    def test_new(self):
+        S = self.settings
+        a = S.New('a', dtype=float, initial=1.5, unit='mm', vmin=0, vmax=10)
+        b = S.New('b', dtype=float, initial=2.5, unit='mm', vmin=0, vmax=10)
+        mode = S.New('mode', dtype=str, choices=('fast', 'slow'), initial='slow')
+        self.assertIsInstance(a, HeadlessLQ)
+        self.assertIs(a.desc, b.desc) # metadata is shared
+        self.assertEqual(a.unit, 'mm')
+        self.assertEqual(S['a'], 1.5)
+        self.assertEqual(mode.val, 'slow')
+        S['mode'] = 'fast'
+        self.assertEqual(mode.val, 'fast')
+        self.assertIsNone(a._signals)
+
+    def test_listeners_and_hardware(self):
+        S = self.settings
+        x = S.New('x', dtype=int, initial=0)
+        received = []
+        writes = []
+        x.add_listener(received.append, argtype=(int,))
+        x.connect_to_hardware(read_func=lambda: 42, write_func=writes.append)
+        S['x'] = 3
+        self.assertEqual(writes, [3])
+        self.assertEqual(x.read_from_hardware(), 42)
+        self.assertEqual(received, [3, 42])
+
+    def test_math_and_batch(self):
+        S = self.settings
+        x = S.New('x', dtype=float)
+        y = S.New('y', dtype=float)
+        total = S.New('total', dtype=float)
+        total.connect_lq_math((x, y), lambda x, y: x + y)
+        changed = []
+        S.settings_changed.connect(changed.append)
+        S.update_values({'x': 1, 'y': 2})
+        self.assertEqual(total.val, 3)
+        self.assertEqual(changed, [['x', 'y']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from ScopeFoundry import BaseApp
+
+
+class LQHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = BaseApp([])
+        self.lq = self.app.settings.New('temperature', dtype=float, initial=0)
+
+    def test_ring_buffer(self):
+        self.lq.enable_history(maxlen=10)
+        for i in range(25):
+            self.lq.update_value(i)
+        t, v = self.lq.history()
+        self.assertEqual(len(v), 10)
+        np.testing.assert_array_equal(v, np.arange(15, 25))
+        self.assertTrue(np.all(np.diff(t) >= 0))
+
+    def test_unchanged_values_recorded(self):
+        self.lq.enable_history(maxlen=10)
+        self.lq.update_value(1)
+        self.lq.update_value(1)
+        self.lq.update_value_fast(1)
+        t, v = self.lq.history()
+        np.testing.assert_array_equal(v, [1, 1, 1])
+
+    def test_since_and_downsample(self):
+        self.lq.enable_history(maxlen=100)
+        buf = self.lq.history_buffer
+        for i in range(100):
+            buf.append(i, t=1000.0 + i)
+        t, v = self.lq.history(since=1090.0)
+        np.testing.assert_array_equal(v, np.arange(90, 100))
+        t, v = self.lq.history(max_points=10)
+        self.assertEqual(len(v), 10)
+        np.testing.assert_array_equal(v, np.arange(0, 100, 10))
+
+    def test_array_lq(self):
+        alq = self.app.settings.New('offsets', dtype=float, array=True, initial=[0, 0, 0])
+        alq.enable_history(maxlen=5)
+        alq.update_value([1, 2, 3])
+        t, v = alq.history()
+        self.assertEqual(v.shape, (1, 3))
+        np.testing.assert_array_equal(v[0], [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from qtpy import QtWidgets
+from ScopeFoundry import BaseApp
+
+
+class LQLazySignalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = BaseApp([])
+        self.lq = self.app.settings.New('exposure', dtype=float, initial=0)
+        self.n_formatted = 0
+        string_value = self.lq.string_value
+        def counting_string_value():
+            self.n_formatted += 1
+            return string_value()
+        self.lq.string_value = counting_string_value
+
+    def test_no_formatting_without_text_receivers(self):
+        received = []
+        self.lq.add_listener(received.append, argtype=(float,))
+        self.lq.update_value(1.0)
+        self.assertEqual(received, [1.0])
+        self.assertEqual(self.n_formatted, 0)
+
+    def test_formatting_with_text_widget(self):
+        widget = QtWidgets.QLineEdit()
+        self.lq.connect_to_widget(widget)
+        self.lq.update_value(2.0)
+        self.assertGreater(self.n_formatted, 0)
+        self.assertEqual(widget.text(), '2')
+
+    def test_disconnect(self):
+        texts = []
+        self.lq.updated_text_value.connect(texts.append)
+        self.lq.update_value(1.0)
+        self.lq.updated_text_value.disconnect(texts.append)
+        n = self.n_formatted
+        self.lq.update_value(2.0)
+        self.assertEqual(texts, ['1'])
+        self.assertEqual(self.n_formatted, n)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from ScopeFoundry import BaseApp
+from ScopeFoundry.logged_quantity import lq_math_graph
+
+
+class LQMathGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = BaseApp([])
+        S = self.app.settings
+        self.a = S.New('a', dtype=float, initial=1)
+        self.b = S.New('b', dtype=float)
+        self.c = S.New('c', dtype=float)
+        self.d = S.New('d', dtype=float)
+        self.b.connect_lq_math(self.a, lambda a: 2*a)
+        self.c.connect_lq_math(self.a, lambda a: 3*a)
+        self.d_inputs = []
+        def calc_d(b, c):
+            self.d_inputs.append((b, c))
+            return b + c
+        self.d.connect_lq_math((self.b, self.c), calc_d)
+
+    def test_diamond_evaluated_once(self):
+        self.d_inputs.clear()
+        self.a.update_value(10)
+        # d is computed once, never from a half updated (b, c)
+        self.assertEqual(self.d_inputs, [(20, 30)])
+        self.assertEqual(self.d.val, 50)
+
+    def test_cycle_detection(self):
+        with self.assertRaises(ValueError):
+            self.a.connect_lq_math(self.d, lambda d: d)
+        with self.assertRaises(ValueError):
+            self.a.connect_lq_math(self.a, lambda a: a)
+
+    def test_batch_update(self):
+        S = self.app.settings
+        x = S.New('x', dtype=float)
+        y = S.New('y', dtype=float)
+        n_calls = []
+        total = S.New('total', dtype=float)
+        total.connect_lq_math((x, y), lambda x, y: n_calls.append(1) or x + y)
+        n_calls.clear()
+        S.update_values({'x': 1, 'y': 2})
+        self.assertEqual(total.val, 3)
+        self.assertEqual(len(n_calls), 1)
+
+    def test_inspection(self):
+        graph = lq_math_graph.as_dict()
+        self.assertEqual(graph['b'], ['a'])
+        self.assertEqual(graph['d'], ['b', 'c'])
+        order = list(graph.keys())
+        self.assertLess(order.index('b'), order.index('d'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Micro-benchmark of the per-call cost of LoggedQuantity.update_value
+versus LoggedQuantity.update_value_fast, as seen by a scan that moves
+a stage once per pixel.
+
+run with:
+    python -m ScopeFoundry.tests.lq_update_value_benchmark
+"""
+import timeit
+from ScopeFoundry import BaseApp
+
+
+def time_per_call(func, n):
+    vals = [float(i) for i in range(n)]
+    def run():
+        for v in vals:
+            func(v)
+    return min(timeit.repeat(run, number=1, repeat=5)) / n
+
+
+if __name__ == '__main__':
+    app = BaseApp([])
+    x_position = app.settings.New('x_position', dtype=float, unit='um')
+    position_log = []
+    x_position.connect_to_hardware(write_func=position_log.append)
+
+    N = 100_000
+    t_slow = time_per_call(x_position.update_value, N)
+    t_fast = time_per_call(x_position.update_value_fast, N)
+    t_nosig = time_per_call(lambda v: x_position.update_value_fast(v, send_signal=False), N)
+
+    print(f"update_value                         {t_slow*1e6:8.2f} us/call")
+    print(f"update_value_fast                    {t_fast*1e6:8.2f} us/call")
+    print(f"update_value_fast(send_signal=False) {t_nosig*1e6:8.2f} us/call")
+    print(f"speedup {t_slow/t_fast:0.1f}x")